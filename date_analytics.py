@@ -1,14 +1,14 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 import pycountry
 import plotly.express as px
-import seaborn as sns
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
+import plotly.graph_objects as go
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas
 from io import BytesIO
 import requests
@@ -23,40 +23,56 @@ st.write("A análise considera o Crescimento do PIB (%) e Crescimento Populacion
 
 # Carregando os dados
 target_columns = ["Country", "Year", "GDP Growth (%)", "Population Growth (%)"]
-try:
-    imoveis = pd.read_csv("imoveis.csv", encoding="latin1")
-    imoveis.columns = imoveis.columns.str.strip()
-    
+
+@st.cache_data
+def load_imoveis(path, colunas):
+    dados = pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+    dados.columns = dados.columns.str.strip()
+
     # Verificando colunas essenciais
-    if not all(col in imoveis.columns for col in target_columns):
-        missing_cols = [col for col in target_columns if col not in imoveis.columns]
-        st.error(f"As seguintes colunas estão ausentes no dataset: {missing_cols}. Por favor, corrija e tente novamente.")
-        st.stop()
+    missing_cols = [col for col in colunas if col not in dados.columns]
+    if missing_cols:
+        raise KeyError(missing_cols)
+
+    return dados.astype(
+        {"Year": "int32[pyarrow]", "GDP Growth (%)": "float32[pyarrow]", "Population Growth (%)": "float32[pyarrow]"}
+    )
 
+try:
+    imoveis = load_imoveis("imoveis.csv", target_columns)
+except KeyError as e:
+    st.error(f"As seguintes colunas estão ausentes no dataset: {e.args[0]}. Por favor, corrija e tente novamente.")
+    st.stop()
 except Exception as e:
     st.error(f"Erro ao carregar os dados: {e}. Certifique-se de que o arquivo `imoveis.csv` está no diretório correto e possui os dados esperados.")
     st.stop()
 
-# Selecionando o ano mais recente
-ano_mais_recente = imoveis["Year"].max()
-dados_recentes = imoveis[imoveis["Year"] == ano_mais_recente]
+# Pesos do índice de qualidade
+pesos = {"GDP Growth (%)": 0.7, "Population Growth (%)": 0.3}
+
+# Seleciona o ano mais recente e calcula o índice de qualidade numa única passagem,
+# guardada em cache junto com os dados carregados
+@st.cache_data
+def recent_scores(dados, pesos):
+    year_arr = dados["Year"].to_numpy()
+    ano = year_arr.max()
+    w = np.array(list(pesos.values()), dtype=np.float32)
+    recentes = dados.iloc[np.flatnonzero(year_arr == ano)].assign(
+        Score=lambda d: d[list(pesos)].to_numpy(dtype=np.float32, copy=False) @ w
+    )
+    return ano, recentes
+
+ano_mais_recente, dados_recentes = recent_scores(imoveis, pesos)
 
 # Checando valores nulos
 if dados_recentes[["GDP Growth (%)", "Population Growth (%)"]].isnull().values.any():
     st.warning("Existem valores nulos nas colunas usadas para análise. Por favor, verifique o dataset.")
     st.stop()
 
-# Criando um índice de qualidade
-pesos = {"GDP Growth (%)": 0.7, "Population Growth (%)": 0.3}
-dados_recentes["Score"] = (
-    dados_recentes["GDP Growth (%)"] * pesos["GDP Growth (%)"] +
-    dados_recentes["Population Growth (%)"] * pesos["Population Growth (%)"]
-)
-
 # Identificando o melhor país
-pais_ideal = dados_recentes.loc[dados_recentes["Score"].idxmax(), "Country"]
-pib_pais = dados_recentes.loc[dados_recentes["Country"] == pais_ideal, "GDP Growth (%)"].values[0]
-pop_pais = dados_recentes.loc[dados_recentes["Country"] == pais_ideal, "Population Growth (%)"].values[0]
+best_idx = dados_recentes["Score"].to_numpy().argmax()
+row = dados_recentes.iloc[best_idx]
+pais_ideal, pib_pais, pop_pais = row["Country"], row["GDP Growth (%)"], row["Population Growth (%)"]
 
 # Gerando análise textual
 analise_textual = f"""
@@ -77,106 +93,173 @@ st.dataframe(imoveis)
 st.subheader(" Análise textual com IA")
 st.markdown(analise_textual)
 
-# Validar nomes de países
+# Validar nomes de países (mesma busca sem distinção de maiúsculas do pycountry)
+@st.cache_resource
+def country_names():
+    return frozenset(c.name.lower() for c in pycountry.countries)
+
 map_data = dados_recentes[["Country", "GDP Growth (%)", "Score"]].copy()
 map_data["Country"] = map_data["Country"].str.strip()  # Remover espaços extras
-invalid_countries = [
-    country for country in map_data["Country"] 
-    if not pycountry.countries.get(name=country)
-]
+mask = ~map_data["Country"].str.lower().isin(country_names())
+invalid_countries = map_data.loc[mask, "Country"].tolist()
 
 if invalid_countries:
     st.warning(f"Os seguintes países não foram reconhecidos e podem não aparecer no mapa: {invalid_countries}. Verifique se os nomes estão em inglês e correspondem aos padrões internacionais.")
 
 
 # Comparativo de Score
-fig_bar = px.bar(
-    dados_recentes,
-    x="Country",
-    y="Score",
-    color="Score",
-    title="Comparativo de Score por País",
-    labels={"Score": "Índice de Qualidade", "Country": "País"}
-)
-st.plotly_chart(fig_bar)
-
-correlation = dados_recentes[["GDP Growth (%)", "Population Growth (%)"]].corr()
+@st.cache_data
+def build_bar(df):
+    score = df["Score"].to_numpy()
+    fig_bar = go.Figure(go.Bar(
+        x=df["Country"].to_numpy(),
+        y=score,
+        marker=dict(color=score, colorscale="Plasma", colorbar=dict(title="Índice de Qualidade"))
+    ))
+    fig_bar.update_layout(title="Comparativo de Score por País", xaxis_title="País", yaxis_title="Índice de Qualidade")
+    return fig_bar.to_dict()
+
+st.plotly_chart(go.Figure(build_bar(dados_recentes)))
+
+colunas_corr = ["GDP Growth (%)", "Population Growth (%)"]
+corr_mat = np.corrcoef(dados_recentes[colunas_corr].to_numpy(np.float32).T)
+correlation = pd.DataFrame(corr_mat, index=colunas_corr, columns=colunas_corr)
 st.write("Correlação entre Crescimento do PIB e Crescimento Populacional:")
 st.write(correlation)
 
-fig, ax = plt.subplots()
-sns.heatmap(correlation, annot=True, cmap="coolwarm")
-st.pyplot(fig)
-
-
-fig_line = px.line(
-    imoveis,
-    x="Year",
-    y=["GDP Growth (%)", "Population Growth (%)"],
-    color="Country",
-    title="Tendência de Crescimento ao Longo dos Anos",
-    labels={"value": "Percentual (%)", "Year": "Ano"}
+@st.cache_data
+def _corr_fig(arr_bytes, shape, labels):
+    m = np.frombuffer(arr_bytes, dtype=np.float32).reshape(shape)
+    return px.imshow(
+        m,
+        x=labels,
+        y=labels,
+        text_auto=".2f",
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale="RdBu_r"
+    ).to_dict()
+
+st.plotly_chart(go.Figure(_corr_fig(corr_mat.astype(np.float32).tobytes(), corr_mat.shape, colunas_corr)))
+
+
+# Formato longo (um indicador por linha), gerado uma única vez
+@st.cache_data
+def long_frame(df):
+    return df.melt(
+        id_vars=["Country", "Year"],
+        value_vars=["GDP Growth (%)", "Population Growth (%)"],
+        var_name="Metric",
+        value_name="value"
+    )
+
+@st.cache_data
+def build_line(df):
+    return px.line(
+        df,
+        x="Year",
+        y="value",
+        color="Country",
+        line_dash="Metric",
+        title="Tendência de Crescimento ao Longo dos Anos",
+        labels={"value": "Percentual (%)", "Year": "Ano", "Metric": "Indicador"}
+    ).to_dict()
+
+st.plotly_chart(go.Figure(build_line(long_frame(imoveis))))
+
+# Padronizando os dados e aplicando K-Means (reaproveitado entre reruns)
+@st.cache_resource
+def fit_clusters(df_recent_values: np.ndarray):
+    scaler = StandardScaler()
+    dados_cluster = scaler.fit_transform(df_recent_values)
+    kmeans = KMeans(n_clusters=3, n_init=1, algorithm="elkan", random_state=0)
+    labels = kmeans.fit_predict(dados_cluster)
+    return scaler, kmeans, labels
+
+scaler, kmeans, labels = fit_clusters(
+    np.ascontiguousarray(dados_recentes[["GDP Growth (%)", "Population Growth (%)"]].to_numpy(np.float32))
 )
-st.plotly_chart(fig_line)
-
-# Padronizando os dados
-scaler = StandardScaler()
-dados_cluster = scaler.fit_transform(dados_recentes[["GDP Growth (%)", "Population Growth (%)"]])
-
-# Aplicando K-Means
-kmeans = KMeans(n_clusters=3, random_state=0)
-dados_recentes["Cluster"] = kmeans.fit_predict(dados_cluster)
+dados_recentes = dados_recentes.assign(Cluster=labels)
 
 # Visualizando os clusters
-fig_cluster = px.scatter(
-    dados_recentes,
-    x="GDP Growth (%)",
-    y="Population Growth (%)",
-    color="Cluster",
-    hover_name="Country",
-    title="Clusterização de Países com Base em Crescimento Econômico e Populacional"
-)
-st.plotly_chart(fig_cluster)
+@st.cache_data
+def build_cluster(df):
+    fig_cluster = go.Figure(go.Scatter(
+        x=df["GDP Growth (%)"].to_numpy(),
+        y=df["Population Growth (%)"].to_numpy(),
+        mode="markers",
+        text=df["Country"].to_numpy(),
+        marker=dict(color=df["Cluster"].to_numpy(), colorscale="Plasma", colorbar=dict(title="Cluster")),
+        hovertemplate="<b>%{text}</b><br>GDP Growth (%)=%{x}<br>Population Growth (%)=%{y}<br>Cluster=%{marker.color}<extra></extra>"
+    ))
+    fig_cluster.update_layout(
+        title="Clusterização de Países com Base em Crescimento Econômico e Populacional",
+        xaxis_title="GDP Growth (%)",
+        yaxis_title="Population Growth (%)"
+    )
+    return fig_cluster.to_dict()
+
+st.plotly_chart(go.Figure(build_cluster(dados_recentes)))
 
 pais_selecionado = st.selectbox("Selecione um país para análise detalhada:", dados_recentes["Country"].unique())
 dados_pais = imoveis[imoveis["Country"] == pais_selecionado]
 
-fig_pais = px.bar(
-    dados_pais,
-    x="Year",
-    y="GDP Growth (%)",
-    title=f"Crescimento do PIB de {pais_selecionado} ao Longo dos Anos"
-)
-st.plotly_chart(fig_pais)
-
-# Dividindo os dados
-X = imoveis[["Year"]]
-y = imoveis["GDP Growth (%)"]
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=0)
-
-# Treinando o modelo
-model = LinearRegression()
-model.fit(X_train, y_train)
-
-# Fazendo previsões
+@st.cache_data
+def build_country_bar(df, pais):
+    fig_pais = go.Figure(go.Bar(x=df["Year"].to_numpy(), y=df["GDP Growth (%)"].to_numpy()))
+    fig_pais.update_layout(
+        title=f"Crescimento do PIB de {pais} ao Longo dos Anos",
+        xaxis_title="Year",
+        yaxis_title="GDP Growth (%)"
+    )
+    return fig_pais.to_dict()
+
+st.plotly_chart(go.Figure(build_country_bar(dados_pais, pais_selecionado)))
+
+# Treinando o modelo e fazendo previsões (reaproveitado entre reruns)
+@st.cache_data
+def fit_forecast(X, y):
+    # Regressão linear com uma única variável: reta de mínimos quadrados
+    years = X.to_numpy(np.float64).ravel()
+    slope, intercept = np.polyfit(years, y.to_numpy(np.float64), 1)
+    predictions = slope * np.arange(2025, 2031, dtype=np.float64) + intercept
+    return slope, intercept, predictions
+
+slope, intercept, predictions = fit_forecast(imoveis[["Year"]], imoveis["GDP Growth (%)"])
 future_years = pd.DataFrame({"Year": range(2025, 2031)})
-predictions = model.predict(future_years)
 future_years["Predicted GDP Growth (%)"] = predictions
 
 # Visualizando as previsões
-fig_forecast = px.line(future_years, x="Year", y="Predicted GDP Growth (%)", title="Previsão de Crescimento do PIB (%)")
-st.plotly_chart(fig_forecast)
-
-fig = px.choropleth(
-    map_data,
-    locations="Country",
-    locationmode="country names",
-    color="Score",
-    hover_name="Country",
-    title="Mapa Interativo: Índice de Qualidade por País",
-    color_continuous_scale="Blues"
-)
-st.plotly_chart(fig)
+@st.cache_data
+def build_forecast(df):
+    fig_forecast = go.Figure(go.Scatter(
+        x=df["Year"].to_numpy(),
+        y=df["Predicted GDP Growth (%)"].to_numpy(),
+        mode="lines"
+    ))
+    fig_forecast.update_layout(
+        title="Previsão de Crescimento do PIB (%)",
+        xaxis_title="Year",
+        yaxis_title="Predicted GDP Growth (%)"
+    )
+    return fig_forecast.to_dict()
+
+st.plotly_chart(go.Figure(build_forecast(future_years)))
+
+@st.cache_data
+def build_map(df):
+    fig = go.Figure(go.Choropleth(
+        locations=df["Country"].to_numpy(),
+        locationmode="country names",
+        z=df["Score"].to_numpy(),
+        colorscale="Blues",
+        colorbar=dict(title="Score"),
+        hovertemplate="<b>%{location}</b><br>Score=%{z}<extra></extra>"
+    ))
+    fig.update_layout(title="Mapa Interativo: Índice de Qualidade por País")
+    return fig.to_dict()
+
+st.plotly_chart(go.Figure(build_map(map_data)))
 
 def generate_pdf(dataframe):
     # Cria um arquivo PDF em memória
@@ -190,29 +273,36 @@ def generate_pdf(dataframe):
     # Adicionar análise descritiva ao PDF
     pdf.setFont("Helvetica", 12)
     pdf.drawString(50, 700, "Resumo Estatístico dos Dados:")
-    summary = dataframe.describe()
-    y_position = 680
-    for column, values in summary.iteritems():
-        pdf.drawString(50, y_position, f"{column}: {values}")
-        y_position -= 20
-        if y_position < 50:
-            pdf.showPage()
-            pdf.setFont("Helvetica", 12)
-            y_position = 750
+    text = pdf.beginText(50, 680)
+    text.setFont("Helvetica", 10)
+    for line in dataframe.describe().to_string().splitlines():
+        text.textLine(line)
+    pdf.drawText(text)
+    y_position = text.getY()
+    pdf.setFont("Helvetica", 12)
 
     # Adicionar gráfico ao PDF
     pdf.drawString(50, y_position - 40, "Gráfico - Crescimento do PIB")
     plt.figure(figsize=(6, 4))
     dataframe["GDP Growth (%)"].plot(kind="bar", title="Crescimento do PIB (%) por País")
-    plt.savefig(buffer, format="png")
-    pdf.drawInlineImage(buffer, 100, y_position - 150, width=400, height=200)
+    png_buf = BytesIO()  # Buffer separado: o PNG não pode ser gravado dentro do PDF
+    plt.savefig(png_buf, format="png", dpi=100)
+    plt.close()
+    png_buf.seek(0)
+    pdf.drawImage(ImageReader(png_buf), 100, y_position - 250, width=400, height=200)
 
     # Finalizar o PDF
     pdf.save()
     buffer.seek(0)  # Voltar ao início do arquivo
     return buffer.getvalue()
 
-st.sidebar.image('logo.webp', width=400)
+# Logo lido do disco uma única vez
+@st.cache_data
+def _logo():
+    with open("logo.webp", "rb") as f:
+        return f.read()
+
+st.sidebar.image(_logo(), width=400)
 st.sidebar.markdown("## Análise Descritiva dos Dados imobiliários")
 st.sidebar.divider()
 st.sidebar.markdown("""
@@ -249,20 +339,27 @@ Williams Rodrigues -
 st.sidebar.link_button("Portfólio Williams Rodrigues", url="https://portifolio-wrvs.streamlit.app/", icon="🌎")
 
 
+# Sessão HTTP reaproveitada entre chamadas (mantém a conexão TCP/TLS aberta)
+@st.cache_resource
+def _http_session():
+    return requests.Session()
+
+# Taxas em relação ao USD, guardadas por 1 hora
+@st.cache_data(ttl=3600)
+def _fetch_usd_rates():
+    url = "https://api.exchangerate-api.com/v4/latest/USD"  # API gratuita
+    response = _http_session().get(url, timeout=5)
+    response.raise_for_status()
+    return response.json()["rates"]
+
 # Função para obter a taxa de câmbio
 def get_exchange_rate(moeda_origem, moeda_destino):
-    url = "https://api.exchangerate-api.com/v4/latest/USD"  # API gratuita
-    
     try:
-        response = requests.get(url)
-        data = response.json()
-        
-        if "rates" not in data:
-            return 1  # Retorna 1 caso a API falhe
+        rates = _fetch_usd_rates()
         
         # Converte para USD primeiro, depois para a moeda de destino
-        taxa_origem = data["rates"].get(moeda_origem, None)
-        taxa_destino = data["rates"].get(moeda_destino, None)
+        taxa_origem = rates.get(moeda_origem, None)
+        taxa_destino = rates.get(moeda_destino, None)
         
         if taxa_origem and taxa_destino:
             return taxa_destino / taxa_origem
@@ -270,23 +367,29 @@ def get_exchange_rate(moeda_origem, moeda_destino):
             return 1  # Caso a moeda não seja encontrada
     
     except Exception as e:
-        st.sidebar.error(f"Erro ao obter taxa de câmbio: {e}")
+        st.error(f"Erro ao obter taxa de câmbio: {e}")
         return 1  # Evita erro no cálculo
 
-# Sidebar
-st.sidebar.header("Conversor de Moedas")
-
 # Lista de moedas suportadas
 moedas = ["BRL", "USD", "EUR"]  # BRL = Real, USD = Dollar, EUR = Euro
 
-moeda_origem = st.sidebar.selectbox("Moeda de Origem", moedas)
-moeda_destino = st.sidebar.selectbox("Moeda de Destino", moedas)
-valor = st.sidebar.number_input("Digite o valor a ser convertido", min_value=0.0)
+# Conversor como fragmento: interagir com ele reexecuta só este bloco, não o app inteiro
+@st.fragment
+def currency_converter():
+    st.header("Conversor de Moedas")
+
+    moeda_origem = st.selectbox("Moeda de Origem", moedas)
+    moeda_destino = st.selectbox("Moeda de Destino", moedas)
+    valor = st.number_input("Digite o valor a ser convertido", min_value=0.0)
 
-if st.sidebar.button("Converter"):
-    taxa = get_exchange_rate(moeda_origem, moeda_destino)
-    valor_convertido = valor * taxa
-    st.sidebar.write(f"O valor convertido de {moeda_origem} para {moeda_destino} é: {valor_convertido:.2f}")
+    if st.button("Converter"):
+        taxa = get_exchange_rate(moeda_origem, moeda_destino)
+        valor_convertido = valor * taxa
+        st.write(f"O valor convertido de {moeda_origem} para {moeda_destino} é: {valor_convertido:.2f}")
+
+# Sidebar
+with st.sidebar:
+    currency_converter()
 
 
 #Agradecimentos ao desenvolvedor da lib